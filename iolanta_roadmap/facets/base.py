@@ -1,83 +1,116 @@
 import html
-import itertools
 import operator
-import textwrap
-from dataclasses import asdict
-from functools import cached_property
-from typing import Dict, Iterable, Tuple
+from functools import cached_property, lru_cache
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
 
-import funcy
 import graphviz
-from dominate.tags import b, font, table, td, tr
-from dominate.util import raw, text
+from graphviz.quoting import quote, quote_edge
 from iolanta.facets.facet import Facet
 from iolanta.models import NotLiteralNode
 
 from iolanta_roadmap.facets.models import Task, TaskWithBranches
 
+XOR_HTML = '<font point-size="24"><b>⊻</b></font>'
 
+EDGE_ATTRS = 'color="#4B5D6C" penwidth=2.5'
+LEAF_NODE_ATTRS = (
+    'fontcolor=white fontname=Arial margin=0.3 shape=rect '
+    'style="filled,rounded"'
+)
+BRANCHED_NODE_ATTRS = 'fontcolor=white fontname=Arial shape=none'
+
+task_key = operator.itemgetter('task')
+
+quote_node_id = lru_cache(maxsize=4096)(quote)
+quote_edge_id = lru_cache(maxsize=4096)(quote_edge)
+
+
+@lru_cache(maxsize=4096)
 def as_graph_id(node: NotLiteralNode) -> str:
     return str(node).replace(':', '_')
 
 
-def wrap_html(source: str, align: str = 'center') -> text:
+def soft_wrap(source: str, width: int = 20) -> List[str]:
+    """
+    Greedily pack whitespace-separated words into lines of up to `width` chars.
+
+    Unlike `textwrap.wrap`, words are never split, neither on hyphens nor when
+    longer than `width`; such a word gets a line of its own.
+    """
+    lines = []
+    line = ''
+    for word in source.split():
+        candidate = f'{line} {word}' if line else word
+        if len(candidate) > width and line:
+            lines.append(line)
+            line = word
+        else:
+            line = candidate
+
+    if line:
+        lines.append(line)
+
+    return lines
+
+
+@lru_cache(maxsize=512)
+def wrap_html(source: str, align: str = 'center') -> str:
     splitter = f'<br align="{align}"/>'
 
     wrapped = splitter.join(
-        textwrap.wrap(
-            html.escape(str(source).replace('"', '')),
-            width=20,
-        ),
+        soft_wrap(html.escape(str(source).replace('"', ''))),
     )
 
-    wrapped = f'{wrapped}{splitter}'
-
-    return raw(wrapped)
+    return f'{wrapped}{splitter}'
 
 
-def wrap_text(source: str) -> str:
-    return '\\n'.join(textwrap.wrap(source, width=20))
+def hash_group_by(
+    iterable: Iterable[Any],
+    key: Callable[[Any], Hashable],
+) -> Dict[Hashable, List[Any]]:
+    """Group items by key in one pass, preserving first-seen key order."""
+    groups: Dict[Hashable, List[Any]] = {}
+    for item in iterable:
+        groups.setdefault(key(item), []).append(item)
 
-
-def format_record_label(raw_label: str) -> str:
-    return raw_label.replace('|', '\\|')
+    return groups
 
 
 class GraphvizRoadmap(Facet[str]):
     def _task_by_id_stream(self) -> Iterable[Tuple[str, Task]]:
         rows = self.stored_query('tasks.sparql', goal=self.iri)
 
-        grouped_rows = itertools.groupby(
-            sorted(
-                rows,
-                key=operator.itemgetter('task'),
-            ),
-            key=operator.itemgetter('task'),
+        grouped_rows = hash_group_by(
+            rows,
+            key=task_key,
         )
 
-        for task_id, rows_per_task in grouped_rows:
-            rows = list(rows_per_task)
-            first_row = funcy.first(rows)
+        for task_id, rows_per_task in grouped_rows.items():
+            first_row = rows_per_task[0]
 
             title = first_row['title'].value
             is_bug = 'is_bug' in first_row
             is_focused = 'is_focused' in first_row
 
-            blocks = list(
-                set(
-                    as_graph_id(blocked_task_id)
-                    for row in rows
-                    if (blocked_task_id := row.get('blocks'))
-                ),
-            )
+            blocks = set()
+            is_branch_of = set()
+            for row in rows_per_task:
+                row_get = row.get
+                if blocked_task_id := row_get('blocks'):
+                    blocks.add(as_graph_id(blocked_task_id))
 
-            is_branch_of = list(
-                set(
-                    as_graph_id(blocked_task_id)
-                    for row in rows
-                    if (blocked_task_id := row.get('is_branch_of'))
-                ),
-            )
+                if parent_task_id := row_get('is_branch_of'):
+                    is_branch_of.add(as_graph_id(parent_task_id))
 
             graph_id = as_graph_id(task_id)
             yield graph_id, Task(
@@ -85,8 +118,8 @@ class GraphvizRoadmap(Facet[str]):
                 is_bug=is_bug,
                 is_focused=is_focused,
                 title=title,
-                blocks=blocks,
-                is_branch_of=is_branch_of,
+                blocks=tuple(sorted(blocks)),
+                is_branch_of=tuple(sorted(is_branch_of)),
             )
 
     @cached_property
@@ -94,144 +127,99 @@ class GraphvizRoadmap(Facet[str]):
         return dict(self._task_by_id_stream())
 
     @cached_property
-    def roadmap(self) -> graphviz.Digraph:
-        graph = graphviz.Digraph(
-            graph_attr={
-                'rankdir': 'LR',
-                'forcelabels': 'true',
-            },
-        )
+    def dot_source(self) -> str:
+        lines = ['digraph {', '\trankdir=LR', '\tforcelabels=true']
 
-        self.draw_nodes_with_branches(graph)
-        self.draw_nodes_without_branches(graph)
-        self.draw_edges(graph)
+        self.draw_nodes_with_branches(lines)
+        self.draw_nodes_without_branches(lines)
+        self.draw_edges(lines)
 
-        return graph
-
-    def find_branches_by_task(self):
-        rows = self.stored_query('branches.sparql')
-
-        groups = itertools.groupby(
-            rows,
-            key=operator.itemgetter('task'),
-        )
+        lines.append('}')
+        return '\n'.join(lines) + '\n'
 
-        return {
-            root_task: [
-                (
-                    as_graph_id(branch['branch']),
-                    format_record_label(str(branch['title'])),
-                )
-                for branch in group
-            ]
-            for root_task, group in groups
-        }
+    @cached_property
+    def roadmap(self) -> graphviz.Source:
+        return graphviz.Source(self.dot_source)
 
     @cached_property
     def task_with_branches_by_id(self) -> Dict[str, TaskWithBranches]:
-        rows = [
-            (is_branch_of, child_task)
-            for child_task in self.task_by_id.values()
-            for is_branch_of in child_task.is_branch_of
-        ]
+        children_by_parent_id: Dict[str, List[Task]] = {}
+        for child_task in self.task_by_id.values():
+            for parent_id in child_task.is_branch_of:
+                children_by_parent_id.setdefault(parent_id, []).append(
+                    child_task,
+                )
 
-        rows = sorted(
-            rows,
-            key=funcy.first,
-        )
+        task_with_branches_by_id = {}
+        for parent_id, children in children_by_parent_id.items():
+            parent = self.task_by_id[parent_id]
+            task_with_branches_by_id[parent_id] = TaskWithBranches(
+                id=parent.id,
+                title=parent.title,
+                is_bug=parent.is_bug,
+                is_focused=parent.is_focused,
+                blocks=parent.blocks,
+                is_branch_of=parent.is_branch_of,
+                branches=tuple(children),
+            )
 
-        groups = itertools.groupby(
-            rows,
-            key=funcy.first,
-        )
+        return task_with_branches_by_id
 
-        return {
-            parent_id: TaskWithBranches(
-                **asdict(self.task_by_id[parent_id]),
-                branches=list(map(funcy.last, children)),
-            )
-            for parent_id, children in groups
-        }
+    @cached_property
+    def branch_parent_ids(self) -> FrozenSet[str]:
+        return frozenset(self.task_with_branches_by_id)
 
-    def draw_nodes_with_branches(self, graph):
+    @cached_property
+    def leaf_task_ids(self) -> Tuple[str, ...]:
+        parent_ids = self.task_with_branches_by_id.keys()
+        return tuple(
+            task_id
+            for task_id, task in self.task_by_id.items()
+            if task_id not in parent_ids and not task.is_branch_of
+        )
+
+    def draw_nodes_with_branches(self, lines: List[str]):
         for parent_id, task in self.task_with_branches_by_id.items():
             wrapped_title = wrap_html(task.title, align='left')
 
-            table_rows = [
-                tr(
-                    td(
-                        wrap_html(branch.title),
-                        border=1 if index < len(task.branches) - 1 else 0,
-                        sides='tb',
-                        port=branch.id,
-                        colspan='2',
-                    ),
-                )
+            head = (
+                f'<tr><td port="xor">{XOR_HTML}</td>'
+                f'<td port="title" align="left"><b>{wrapped_title}</b></td>'
+                '</tr>'
+            )
+
+            last_index = len(task.branches) - 1
+            table_rows = ''.join(
+                f'<tr><td border="{1 if index < last_index else 0}" '
+                f'sides="tb" port="{html.escape(branch.id)}" colspan="2">'
+                f'{wrap_html(branch.title)}</td></tr>'
                 for index, branch in enumerate(task.branches)
-            ]
-
-            xor = font(b('⊻'))
-            xor['point-size'] = 24
-
-            label = table(
-                tr(
-                    td(
-                        xor,
-                        port='xor',
-                    ),
-                    td(
-                        b(wrapped_title),
-                        port='title',
-                        align='left',
-                    ),
-                ),
-                *table_rows,
-
-                border='1',
-                cellborder='0',
-                cellpadding='15',
-                cellspacing='0',
-                style='rounded',
-                bgcolor=task.background_color,
-            ).render(
-                indent='',
-                pretty=False,
             )
 
-            graph.node(
-                name=task.id,
-                label=f'<{label}>',
-                shape='none',
-                fontcolor='white',
-                fontname='Arial',
-                color=task.pen_color,
+            bgcolor = html.escape(task.background_color)
+            label = (
+                '<table border="1" cellborder="0" cellpadding="15" '
+                f'cellspacing="0" style="rounded" bgcolor="{bgcolor}">'
+                f'{head}{table_rows}</table>'
             )
 
-    def draw_nodes_without_branches(self, graph):
-        tasks = [
-            task
-            for task in self.task_by_id.values()
-            if (
-                task.id not in self.task_with_branches_by_id
-                and not task.is_branch_of
+            lines.append(
+                f'\t{quote_node_id(task.id)} [label=<{label}> '
+                f'color="{task.pen_color}" {BRANCHED_NODE_ATTRS}]',
             )
-        ]
 
-        for task in tasks:
+    def draw_nodes_without_branches(self, lines: List[str]):
+        for task_id in self.leaf_task_ids:
+            task = self.task_by_id[task_id]
             label = wrap_html(task.title)
-            graph.node(
-                name=task.id,
-                label=f'<<b>{label}</b>>',
-                shape='rect',
-                style='filled,rounded',
-                fontcolor='white',
-                fontname='Arial',
-                fillcolor=task.background_color,
-                color=task.pen_color,
-                margin='0.3',
+            lines.append(
+                f'\t{quote_node_id(task.id)} [label=<<b>{label}</b>> '
+                f'color="{task.pen_color}" '
+                f'fillcolor="{task.background_color}" '
+                f'{LEAF_NODE_ATTRS}]',
             )
 
-    def draw_edges(self, graph):
+    def draw_edges(self, lines: List[str]):
         for task in self.task_by_id.values():
             for blocked_task_id in task.blocks:
                 blocked_task = self.task_by_id.get(blocked_task_id)
@@ -240,33 +228,38 @@ class GraphvizRoadmap(Facet[str]):
                     continue
 
                 # Destination
-                headport = 'w'
-                if parent_node_id := funcy.first(blocked_task.is_branch_of):
+                headport: Optional[str] = 'w'
+                if blocked_task.is_branch_of:
+                    parent_node_id = blocked_task.is_branch_of[0]
                     blocked_task_id = f'{parent_node_id}:{blocked_task_id}:w'
                     headport = None
 
-                elif blocked_task_id in self.task_with_branches_by_id:
+                elif blocked_task_id in self.branch_parent_ids:
                     blocked_task_id = f'{blocked_task_id}:xor:w'
                     headport = None
 
                 # Source
                 source_task_id = task.id
-                tailport = 'e'
+                tailport: Optional[str] = 'e'
 
-                if source_task_id in self.task_with_branches_by_id:
+                if source_task_id in self.branch_parent_ids:
                     source_task_id = f'{source_task_id}:title:e'
                     tailport = None
 
-                elif parent_of_source_task_id := funcy.first(task.is_branch_of):
+                elif task.is_branch_of:
+                    parent_of_source_task_id = task.is_branch_of[0]
                     source_task_id = f'{parent_of_source_task_id}:{source_task_id}:e'
                     tailport = None
 
-                if task.id in self.task_by_id:
-                    graph.edge(
-                        source_task_id,
-                        blocked_task_id,
-                        color='#4B5D6C',
-                        penwidth='2.5',
-                        headport=headport,
-                        tailport=tailport,
-                    )
+                ports = ''
+                if headport is not None:
+                    ports = f'{ports} headport={headport}'
+
+                if tailport is not None:
+                    ports = f'{ports} tailport={tailport}'
+
+                lines.append(
+                    f'\t{quote_edge_id(source_task_id)} -> '
+                    f'{quote_edge_id(blocked_task_id)} '
+                    f'[{EDGE_ATTRS}{ports}]',
+                )
@@ -1,31 +1,32 @@
 from dataclasses import dataclass, field
-from typing import List
+from typing import Dict, Tuple
 
+# (is_focused, is_bug) → (background_color, pen_color)
+COLORS: Dict[Tuple[bool, bool], Tuple[str, str]] = {
+    (True, True): ('#730FC3', '#730FC3'),
+    (True, False): ('#730FC3', '#730FC3'),
+    (False, True): ('#AC6363', '#AC6363'),
+    (False, False): ('#788897', '#4B5D6C'),
+}
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class Task:
     id: str
     title: str
     is_bug: bool = False
     is_focused: bool = False
-    blocks: List[str] = field(default_factory=list)
-    is_branch_of: List[str] = field(default_factory=list)
-
-    @property
-    def background_color(self):
-        if self.is_focused:
-            return '#730FC3'
-
-        return '#AC6363' if self.is_bug else '#788897'
-
-    @property
-    def pen_color(self):
-        if self.is_focused:
-            return '#730FC3'
+    blocks: Tuple[str, ...] = ()
+    is_branch_of: Tuple[str, ...] = ()
+    background_color: str = field(init=False)
+    pen_color: str = field(init=False)
 
-        return '#AC6363' if self.is_bug else '#4B5D6C'
+    def __post_init__(self):
+        background_color, pen_color = COLORS[self.is_focused, self.is_bug]
+        object.__setattr__(self, 'background_color', background_color)
+        object.__setattr__(self, 'pen_color', pen_color)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class TaskWithBranches(Task):
-    branches: List[Task] = field(default_factory=list)
+    branches: Tuple[Task, ...] = ()
@@ -13,3 +13,37 @@ def iolanta_with_roadmap() -> Iolanta:
             },
         },
     })
+
+
+@pytest.fixture()
+def iolanta_with_branches() -> Iolanta:
+    return Iolanta().add({
+        'roadmap:roadmap': [
+            {
+                '$id': 'goal',
+                'title': 'Goal',
+            },
+            {
+                '$id': 'backend',
+                'title': 'Pick a backend',
+                'blocks': 'goal',
+            },
+            {
+                '$id': 'postgres',
+                'title': 'Postgres',
+                'roadmap:is-branch-of': {'$id': 'backend'},
+            },
+            {
+                '$id': 'sqlite',
+                'title': 'SQLite',
+                'roadmap:is-branch-of': {'$id': 'backend'},
+                'blocks': 'goal',
+            },
+            {
+                '$id': 'research',
+                'title': 'Research',
+                'bug': True,
+                'blocks': 'backend',
+            },
+        ],
+    })
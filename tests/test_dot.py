@@ -0,0 +1,78 @@
+import pytest
+from iolanta.iolanta import Iolanta
+from iolanta.namespaces import IOLANTA, LOCAL
+
+from iolanta_roadmap.facets.svg import SVGRoadmap
+
+
+@pytest.fixture()
+def dot_lines(iolanta_with_branches: Iolanta) -> list[str]:
+    return SVGRoadmap(
+        iri=LOCAL.goal,
+        iolanta=iolanta_with_branches,
+        environment=IOLANTA.svg,
+    ).dot_source.splitlines()
+
+
+def test_graph_attributes(dot_lines: list[str]):
+    assert dot_lines[:3] == ['digraph {', '\trankdir=LR', '\tforcelabels=true']
+    assert dot_lines[-1] == '}'
+
+
+def test_branched_node(dot_lines: list[str]):
+    assert (
+        '\tlocal_backend [label=<'
+        '<table border="1" cellborder="0" cellpadding="15" cellspacing="0" '
+        'style="rounded" bgcolor="#788897">'
+        '<tr><td port="xor"><font point-size="24"><b>⊻</b></font></td>'
+        '<td port="title" align="left">'
+        '<b>Pick a backend<br align="left"/></b></td></tr>'
+        '<tr><td border="1" sides="tb" port="local_postgres" colspan="2">'
+        'Postgres<br align="center"/></td></tr>'
+        '<tr><td border="0" sides="tb" port="local_sqlite" colspan="2">'
+        'SQLite<br align="center"/></td></tr>'
+        '</table>> color="#4B5D6C" fontcolor=white fontname=Arial shape=none]'
+    ) in dot_lines
+
+
+@pytest.mark.parametrize('line', [
+    (
+        '\tlocal_goal [label=<<b>Goal<br align="center"/></b>> '
+        'color="#730FC3" fillcolor="#730FC3" '
+        'fontcolor=white fontname=Arial margin=0.3 shape=rect '
+        'style="filled,rounded"]'
+    ),
+    (
+        '\tlocal_research [label=<<b>Research<br align="center"/></b>> '
+        'color="#AC6363" fillcolor="#AC6363" '
+        'fontcolor=white fontname=Arial margin=0.3 shape=rect '
+        'style="filled,rounded"]'
+    ),
+])
+def test_leaf_node(dot_lines: list[str], line: str):
+    assert line in dot_lines
+
+
+def test_branches_are_not_drawn_as_nodes(dot_lines: list[str]):
+    assert not any(
+        line.startswith(('\tlocal_postgres ', '\tlocal_sqlite '))
+        for line in dot_lines
+    )
+
+
+@pytest.mark.parametrize('line', [
+    (
+        '\tlocal_backend:title:e -> local_goal '
+        '[color="#4B5D6C" penwidth=2.5 headport=w]'
+    ),
+    (
+        '\tlocal_backend:local_sqlite:e -> local_goal '
+        '[color="#4B5D6C" penwidth=2.5 headport=w]'
+    ),
+    (
+        '\tlocal_research -> local_backend:xor:w '
+        '[color="#4B5D6C" penwidth=2.5 tailport=e]'
+    ),
+])
+def test_edge(dot_lines: list[str], line: str):
+    assert line in dot_lines
@@ -0,0 +1,19 @@
+import pytest
+
+from iolanta_roadmap.facets.base import soft_wrap
+
+
+@pytest.mark.parametrize(('source', 'lines'), [
+    ('Goal', ['Goal']),
+    ('', []),
+    (
+        'Implement the roadmap plugin for iolanta',
+        ['Implement the', 'roadmap plugin for', 'iolanta'],
+    ),
+    (
+        'A very-long-hyphenated-identifier here',
+        ['A', 'very-long-hyphenated-identifier', 'here'],
+    ),
+])
+def test_soft_wrap(source: str, lines: list[str]):
+    assert soft_wrap(source) == lines